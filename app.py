@@ -1,8 +1,8 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-from dataclasses import replace
 
-from climate_model import ModelInputs, estimate, default_config
+from climate_model import ModelConfig, ModelInputs, ModelResult, estimate, default_config
 
 
 st.set_page_config(
@@ -17,7 +17,82 @@ st.caption(
     "Resultaten ska ses som en indikation och behöver kalibreras mot projektspecifik mängdning/LCA."
 )
 
-cfg = default_config()
+
+@st.cache_resource(show_spinner=False)
+def get_config() -> ModelConfig:
+    # Konfigurationen är fryst och konstant – bygg den en gång per process och dela samma instans.
+    return default_config()
+
+
+cfg = get_config()
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def estimate_cached(inp: ModelInputs) -> ModelResult:
+    # ModelConfig är konstant (r skickas som override i indata), så cachenyckeln är bara indata.
+    return estimate(inp, get_config())
+
+
+def render_results(res: ModelResult) -> None:
+    col1, col2, col3 = st.columns([1.2, 1, 1])
+    with col1:
+        st.metric(
+            "Estimerad klimatpåverkan",
+            f"{res.total_t_per_m2_bta:.3f} ton CO₂e/m² BTA",
+            help="Beräknat som kg CO2e/m² BTA / 1000.",
+        )
+        st.caption(f"({res.total_kg_per_m2_bta:.0f} kg CO₂e/m² BTA)")
+
+    with col2:
+        st.metric(
+            "Jämfört med 0,375 ton CO₂e/m² BTA",
+            f"{res.delta_vs_reference_kg:+.0f} kg",
+            f"{res.delta_vs_reference_percent:+.1f} %",
+            help="Referensen 0,375 ton (=375 kg) används som jämförelse (Boverkets förslag).",
+        )
+
+    with col3:
+        st.metric(
+            "Virkesandel (screening)",
+            f"{res.timber_t_per_m2_bta:.3f} ton/m² BTA",
+        )
+
+    st.subheader("Nedbrytning (kg CO₂e/m² BTA)")
+    breakdown = res.breakdown_kg_per_m2_bta
+    keys = np.array(list(breakdown.keys()))
+    vals = np.fromiter(breakdown.values(), dtype=np.float64, count=len(breakdown))
+    order = np.argsort(-vals, kind="stable")  # störst först
+    df = pd.DataFrame({"Byggdel": keys[order], "kg CO2e/m² BTA": vals[order]})
+
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.bar_chart(df.set_index("Byggdel"))
+
+    with st.expander("🔎 Antaganden & begränsningar"):
+        st.markdown(
+            """
+- Modellen utgår från en median-referensnivå för flerbostadshus och skalar denna med enkla multiplikatorer.
+- Effekten av formfaktor och fönsterandel modelleras via klimatskärmsbidraget (Aom/BTA och fönster/vägg-mix).
+- Garagepåslag bygger på en schablon (+48 kg CO₂e/m² Atemp vid parkeringstal 0,5) och konverteras via Atemp/BTA.
+- Klimatförbättring bygger på skillnaden mellan median med 'svenskt medelvärde' och 'klimatförbättrade produktval'
+  i KTH:s referensvärdesrapport, för vald systemgräns.
+- För riktiga klimatdeklarationer krävs projektspecifik resurssammanställning och klimatdata (EPD/generiska data).
+"""
+        )
+        if res.notes:
+            st.warning("Notiser:\n- " + "\n- ".join(res.notes))
+        else:
+            st.info("Inga notiser för dessa indata.")
+
+    with st.expander("📚 Källor (översikt)"):
+        st.markdown(
+            """
+Modellen är kalibrerad mot och inspirerad av bl.a.:
+- KTH/WSP/IVL: *Referensvärden för klimatpåverkan vid uppförande av byggnader* (Tabell 9 m.fl.)
+- Boverket: rapporter/PM om gränsvärden och referensvärden för byggnaders klimatpåverkan
+- SBUF/IVL/Byggföretagen: jämförande LCA för fem byggsystem (typhus) samt schablon för garagepåslag
+"""
+        )
+
 
 with st.sidebar:
     st.header("Indata")
@@ -58,7 +133,6 @@ with st.sidebar:
         step=0.1,
         help="r=4 betyder att 1 m² fönster antas ge ~4× klimatpåverkan jämfört med 1 m² vägg. Justera vid kalibrering.",
     )
-    cfg = replace(cfg, window_to_wall_intensity_ratio=r_win)
 
     st.subheader("Byggnad")
     floors = st.slider("Antal våningar ovan mark", 1, 16, 6, 1)
@@ -139,82 +213,47 @@ with st.sidebar:
     st.caption("Tips: Justera antaganden i climate_model.py om du vill kalibrera modellen mot egen LCA.")
 
 
-inp = ModelInputs(
-    system_boundary=system_boundary,
-    form_factor=float(form_factor),
-    window_ratio=float(window_ratio),
-    floors=int(floors),
-    building_height_m=building_height_m,
-    structural_system=structural_system,
-    method=method,
-    heavy_concrete_design=heavy_concrete_design,
-    climate_improved_materials=climate_improved,
-    climate_improved_applicability=float(climate_improved_applicability),
-    basement=basement,
-    underground_garage=underground_garage,
-    parking_ratio=float(parking_ratio),
-    atemp_to_bta=float(atemp_to_bta),
-    timber_t_per_m2_override=timber_override,
+# Oförändrade widgetvärden (t.ex. när bara en expander togglas) -> återanvänd indata och resultat.
+widget_key = (
+    system_boundary,
+    form_factor,
+    window_ratio,
+    r_win,
+    floors,
+    building_height_m,
+    structural_system,
+    method,
+    heavy_concrete_design,
+    climate_improved,
+    climate_improved_applicability,
+    basement,
+    underground_garage,
+    parking_ratio,
+    atemp_to_bta,
+    timber_override,
 )
-
-res = estimate(inp, cfg)
-
-col1, col2, col3 = st.columns([1.2, 1, 1])
-with col1:
-    st.metric(
-        "Estimerad klimatpåverkan",
-        f"{res.total_t_per_m2_bta:.3f} ton CO₂e/m² BTA",
-        help="Beräknat som kg CO2e/m² BTA / 1000.",
-    )
-    st.caption(f"({res.total_kg_per_m2_bta:.0f} kg CO₂e/m² BTA)")
-
-with col2:
-    st.metric(
-        "Jämfört med 0,375 ton CO₂e/m² BTA",
-        f"{res.delta_vs_reference_kg:+.0f} kg",
-        f"{res.delta_vs_reference_percent:+.1f} %",
-        help="Referensen 0,375 ton (=375 kg) används som jämförelse (Boverkets förslag).",
+if st.session_state.get("last_key") == widget_key:
+    inp, res = st.session_state["last_inp"], st.session_state["last_res"]
+else:
+    inp = ModelInputs(
+        system_boundary=system_boundary,
+        form_factor=float(form_factor),
+        window_ratio=float(window_ratio),
+        floors=int(floors),
+        building_height_m=building_height_m,
+        structural_system=structural_system,
+        method=method,
+        heavy_concrete_design=heavy_concrete_design,
+        climate_improved_materials=climate_improved,
+        climate_improved_applicability=float(climate_improved_applicability),
+        basement=basement,
+        underground_garage=underground_garage,
+        parking_ratio=float(parking_ratio),
+        atemp_to_bta=float(atemp_to_bta),
+        timber_t_per_m2_override=timber_override,
+        window_to_wall_intensity_ratio_override=float(r_win),
     )
+    res = estimate_cached(inp)
+    st.session_state.update(last_key=widget_key, last_inp=inp, last_res=res)
 
-with col3:
-    st.metric(
-        "Virkesandel (screening)",
-        f"{res.timber_t_per_m2_bta:.3f} ton/m² BTA",
-    )
-
-st.subheader("Nedbrytning (kg CO₂e/m² BTA)")
-df = pd.DataFrame(
-    {
-        "Byggdel": list(res.breakdown_kg_per_m2_bta.keys()),
-        "kg CO2e/m² BTA": list(res.breakdown_kg_per_m2_bta.values()),
-    }
-).sort_values("kg CO2e/m² BTA", ascending=False)
-
-st.dataframe(df, use_container_width=True, hide_index=True)
-st.bar_chart(df.set_index("Byggdel"))
-
-with st.expander("🔎 Antaganden & begränsningar"):
-    st.markdown(
-        """
-- Modellen utgår från en median-referensnivå för flerbostadshus och skalar denna med enkla multiplikatorer.
-- Effekten av formfaktor och fönsterandel modelleras via klimatskärmsbidraget (Aom/BTA och fönster/vägg-mix).
-- Garagepåslag bygger på en schablon (+48 kg CO₂e/m² Atemp vid parkeringstal 0,5) och konverteras via Atemp/BTA.
-- Klimatförbättring bygger på skillnaden mellan median med 'svenskt medelvärde' och 'klimatförbättrade produktval'
-  i KTH:s referensvärdesrapport, för vald systemgräns.
-- För riktiga klimatdeklarationer krävs projektspecifik resurssammanställning och klimatdata (EPD/generiska data).
-"""
-    )
-    if res.notes:
-        st.warning("Notiser:\n- " + "\n- ".join(res.notes))
-    else:
-        st.info("Inga notiser för dessa indata.")
-
-with st.expander("📚 Källor (översikt)"):
-    st.markdown(
-        """
-Modellen är kalibrerad mot och inspirerad av bl.a.:
-- KTH/WSP/IVL: *Referensvärden för klimatpåverkan vid uppförande av byggnader* (Tabell 9 m.fl.)
-- Boverket: rapporter/PM om gränsvärden och referensvärden för byggnaders klimatpåverkan
-- SBUF/IVL/Byggföretagen: jämförande LCA för fem byggsystem (typhus) samt schablon för garagepåslag
-"""
-    )
+render_results(res)
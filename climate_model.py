@@ -24,12 +24,57 @@ Alla parametrar är justerbara för kalibrering mot egen data.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import MISSING, dataclass, field, fields
+from functools import lru_cache
 from typing import Dict, Literal, Optional, Tuple
 
+import numpy as np
+import pandas as pd
+from numba import njit
+
 
 SystemBoundary = Literal["2022", "2027"]
 StructuralSystem = Literal["Betong", "Trä", "Stål"]
+STRUCTURAL_SYSTEMS: Tuple[StructuralSystem, ...] = ("Betong", "Trä", "Stål")
+_SYSTEM_INDEX: Dict[str, int] = {k: i for i, k in enumerate(STRUCTURAL_SYSTEMS)}
+
+# Systemgränser i fast ordning; interna tabeller indexeras med boundary_idx (0 = 2022, 1 = 2027).
+BOUNDARIES: Tuple[SystemBoundary, ...] = ("2022", "2027")
+_BOUNDARY_INDEX: Dict[str, int] = {k: i for i, k in enumerate(BOUNDARIES)}
+
+# Byggdelskategorier i fast ordning. Nedbrytningen räknas internt som en np.ndarray
+# med dessa index och görs om till en dict först i ModelResult.
+COMPONENTS: Tuple[str, ...] = (
+    "Stomme",
+    "Grund",
+    "Klimatskärm",
+    "Innerväggar",
+    "Invändiga ytskikt & installationer",
+)
+IDX_STOMME, IDX_GRUND, IDX_KLIMATSKARM, IDX_INNERVAGGAR, IDX_YTSKIKT = range(len(COMPONENTS))
+_COMPONENT_INDEX: Dict[str, int] = {k: i for i, k in enumerate(COMPONENTS)}
+
+# Byggdelar som påverkas av stom- och metodval.
+_STRUCT_IDX = np.array([IDX_STOMME, IDX_GRUND, IDX_INNERVAGGAR])
+
+# Boverkets föreslagna (avrundade) median/gränsvärde för flerbostadshus (kg/m² BTA)
+REFERENCE_KG_PER_M2_BTA = 375.0
+
+# Byggdelar som reduceras av klimatförbättrade material (betong/metall dominerar).
+_AFFECTED_MASK = np.array([True, True, True, False, False])
+
+
+@dataclass(frozen=True)
+class _ConfigArrays:
+    # Samma parametrar som i ModelConfig, men som C-kontiguösa float64-arrayer
+    # som kan skickas direkt till den numeriska kärnan (numba nopython).
+    shares: np.ndarray  # (len(BOUNDARIES), len(COMPONENTS))
+    struct_mult_table: np.ndarray  # (len(STRUCTURAL_SYSTEMS), len(method_index), 2, len(BOUNDARIES))
+    median: np.ndarray  # (len(BOUNDARIES),)
+    median_improved: np.ndarray  # (len(BOUNDARIES),)
+
+    # Metodnamn -> index i struct_mult_table (samma ordning som method_multiplier).
+    method_index: Dict[str, int]
 
 
 @dataclass(frozen=True)
@@ -51,6 +96,11 @@ class ModelConfig:
     # Relativ klimatintensitet (fönster vs. ogenomskinlig vägg).
     window_to_wall_intensity_ratio: float
 
+    # Förberäknade inverser (härleds i __post_init__): 1/ref_form_factor och 1/fönster/vägg-mixen
+    # vid referensfönsterandel, så att varje anrop multiplicerar i stället för att dividera.
+    inv_ref_form_factor: float = field(init=False, repr=False, compare=False)
+    inv_window_mix_denom: float = field(init=False, repr=False, compare=False)
+
     # Stomsystems-/metodmultiplikatorer (≈ påverkar främst stomme+grund)
     # Nycklarna matchar val i Streamlit.
     method_multiplier: Dict[str, float]
@@ -69,6 +119,29 @@ class ModelConfig:
     # Baspåslag för "källare utan garage" (kg CO2e/m² BTA) – osäkert, görs justerbart.
     basement_add_kg_per_m2_bta: float
 
+    # Arrayform av andelar, medianer och förberäknade stommultiplikatorer för beräkningskärnan.
+    # Härleds från fälten ovan i __post_init__ (även efter dataclasses.replace()).
+    arrays: _ConfigArrays = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "inv_ref_form_factor", 1.0 / self.ref_form_factor)
+        object.__setattr__(
+            self,
+            "inv_window_mix_denom",
+            _inv_window_mix_denom(self.ref_window_ratio, self.window_to_wall_intensity_ratio),
+        )
+        object.__setattr__(
+            self,
+            "arrays",
+            _build_arrays(
+                self.median_kg_per_m2,
+                self.median_kg_per_m2_climate_improved,
+                self.shares_2022,
+                self.shares_2027,
+                self.method_multiplier,
+            ),
+        )
+
 
 @dataclass(frozen=True)
 class ModelInputs:
@@ -100,6 +173,9 @@ class ModelInputs:
     # Virke
     timber_t_per_m2_override: Optional[float] = None
 
+    # Kalibrering: ersätter cfg.window_to_wall_intensity_ratio för detta anrop
+    window_to_wall_intensity_ratio_override: Optional[float] = None
+
 
 @dataclass(frozen=True)
 class ModelResult:
@@ -115,6 +191,77 @@ class ModelResult:
     notes: Tuple[str, ...] = ()
 
 
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    # Konfigurationen är fryst och delas mellan anrop – skydda arrayen mot skrivning.
+    arr = np.ascontiguousarray(arr, dtype=np.float64)
+    arr.setflags(write=False)
+    return arr
+
+
+def _struct_mult(
+    method_multiplier: Dict[str, float],
+    structural_system: str,
+    method: str,
+    heavy_concrete_design: bool,
+    boundary_idx: int,
+) -> float:
+    # Stom- och metodval: påverkar "stomme+grund" dominerande.
+    method_mult = method_multiplier.get(method, 1.0)
+
+    # Extra påslag för "tung betongdimensionering" (t.ex. massiva skalväggar)
+    heavy_mult = 1.10 if heavy_concrete_design else 1.0
+
+    # Stomsystemfaktor: trä sänker ofta stomme/grund-relaterad klimatpåverkan.
+    # Här modelleras det som en reduktion på de stomrelaterade delarna, inte på allt.
+    if structural_system == "Trä":
+        # Trästomme: i KTH:s referensvärdesstudie är träbyggnader (exkl. småhus) tydligt lägre än betong/stål.
+        # Vi applicerar därför en reduktion på de stomrelaterade byggdelarna. Storleken är kalibrerbar och
+        # sätts lite olika för 2022/2027-systemgräns.
+        system_struct_mult = (0.47, 0.51)[boundary_idx]
+    elif structural_system == "Stål":
+        system_struct_mult = 1.05
+    else:
+        system_struct_mult = 1.00
+
+    return method_mult * heavy_mult * system_struct_mult
+
+
+def _inv_window_mix_denom(ref_window_ratio: float, r: float) -> float:
+    return 1.0 / (ref_window_ratio * r + (1 - ref_window_ratio) * 1.0)
+
+
+def _build_arrays(
+    median: Dict[SystemBoundary, float],
+    median_improved: Dict[SystemBoundary, float],
+    shares_2022: Dict[str, float],
+    shares_2027: Dict[str, float],
+    method_multiplier: Dict[str, float],
+) -> _ConfigArrays:
+    shares = np.zeros((len(BOUNDARIES), len(COMPONENTS)))
+    for b, shares_b in enumerate((shares_2022, shares_2027)):
+        for k, v in shares_b.items():
+            shares[b, _COMPONENT_INDEX[k]] = v
+
+    # Kombinerad stommultiplikator per (stomsystem, metod, tung betongdimensionering, boundary_idx).
+    method_index = {m: i for i, m in enumerate(method_multiplier)}
+    struct_mult_table = np.empty((len(STRUCTURAL_SYSTEMS), len(method_index), 2, len(BOUNDARIES)))
+    for si, system in enumerate(STRUCTURAL_SYSTEMS):
+        for method, mi in method_index.items():
+            for heavy in (False, True):
+                for b in range(len(BOUNDARIES)):
+                    struct_mult_table[si, mi, int(heavy), b] = _struct_mult(
+                        method_multiplier, system, method, heavy, b
+                    )
+
+    return _ConfigArrays(
+        shares=_readonly(shares),
+        struct_mult_table=_readonly(struct_mult_table),
+        median=_readonly([median[b] for b in BOUNDARIES]),
+        median_improved=_readonly([median_improved[b] for b in BOUNDARIES]),
+        method_index=method_index,
+    )
+
+
 def default_config() -> ModelConfig:
     # Medianvärden för flerbostadshus från KTH Tabell 9 (2022/2027 systemgräns).
     # Boverket har i vissa sammanhang avrundat 373 -> 375 för gränsvärde.
@@ -174,129 +321,212 @@ def default_config() -> ModelConfig:
     )
 
 
-def _validate_inputs(inp: ModelInputs) -> Tuple[str, ...]:
+@lru_cache(maxsize=1)
+def _shared_default_config() -> ModelConfig:
+    # Delad instans för anrop utan cfg – default_config() bygger om alla tabeller vid varje anrop.
+    return default_config()
+
+
+@lru_cache(maxsize=256)
+def _validate(
+    form_factor: float,
+    window_ratio: float,
+    floors: int,
+    parking_ratio: float,
+    atemp_to_bta: float,
+    climate_improved_applicability: float,
+) -> Tuple[str, ...]:
     notes = []
-    if not (0.2 <= inp.form_factor <= 1.5):
+    if not (0.2 <= form_factor <= 1.5):
         notes.append("Formfaktor verkar ligga utanför normalt intervall (0,2–1,5).")
-    if not (0.0 <= inp.window_ratio <= 0.9):
+    if not (0.0 <= window_ratio <= 0.9):
         notes.append("Fönsterandel bör ligga mellan 0 och 0,9.")
-    if inp.floors < 1:
+    if floors < 1:
         notes.append("Antal våningar måste vara minst 1.")
-    if not (0.0 <= inp.parking_ratio <= 2.0):
+    if not (0.0 <= parking_ratio <= 2.0):
         notes.append("Parkeringstal/garagefaktor bör normalt ligga mellan 0 och 2.")
-    if not (0.7 <= inp.atemp_to_bta <= 1.0):
+    if not (0.7 <= atemp_to_bta <= 1.0):
         notes.append("Atemp/BTA bör normalt ligga mellan 0,7 och 1,0.")
-    if inp.climate_improved_applicability < 0 or inp.climate_improved_applicability > 1:
+    if climate_improved_applicability < 0 or climate_improved_applicability > 1:
         notes.append("Applicability för klimatförbättring måste ligga 0..1.")
     return tuple(notes)
 
 
-def estimate(inp: ModelInputs, cfg: Optional[ModelConfig] = None) -> ModelResult:
-    cfg = cfg or default_config()
-    notes = list(_validate_inputs(inp))
-
-    boundary = inp.system_boundary
-    baseline = cfg.median_kg_per_m2[boundary]
+def _validate_inputs(inp: ModelInputs) -> Tuple[str, ...]:
+    # Memoiserat på de validerade primitiverna – samma indata återkommer ofta i en session.
+    return _validate(
+        inp.form_factor,
+        inp.window_ratio,
+        inp.floors,
+        inp.parking_ratio,
+        inp.atemp_to_bta,
+        inp.climate_improved_applicability,
+    )
 
-    shares = cfg.shares_2022 if boundary == "2022" else cfg.shares_2027
 
-    # 1) Basbidrag per byggdel (kg CO2e/m² BTA)
-    breakdown = {k: baseline * v for k, v in shares.items()}
+@njit(cache=True, fastmath=True)
+def _estimate_core(
+    boundary_idx: int,
+    shares: np.ndarray,
+    median: np.ndarray,
+    median_improved: np.ndarray,
+    form_factor: float,
+    inv_ref_form_factor: float,
+    window_ratio: float,
+    r: float,
+    inv_window_mix_denom: float,
+    floors: int,
+    has_height: bool,
+    building_height_m: float,
+    struct_mult: float,
+    basement: bool,
+    basement_add: float,
+    underground_garage: bool,
+    garage_add: float,
+    atemp_to_bta: float,
+    parking_ratio: float,
+    climate_improved: bool,
+    applicability: float,
+) -> Tuple[np.ndarray, float, bool]:
+    """Numerisk kärna i estimate() (steg 1-6). Returnerar (nedbrytning, total, klimatförbättring_ok).
+
+    Totalen hålls löpande uppdaterad med varje stegs förändring i stället för att summeras om.
+
+    Tabellerna kommer från ModelConfig.arrays och indexeras med boundary_idx.
+    has_height=False betyder "ingen byggnadshöjd angiven" (building_height_m ignoreras då).
+    """
+    # 1) Basbidrag per byggdel (kg CO2e/m² BTA), indexerat enligt COMPONENTS
+    baseline = median[boundary_idx]
+    breakdown = baseline * shares[boundary_idx]
+    total = breakdown.sum()  # = baseline när andelarna summerar till 1.0
 
     # 2) Geometri: formfaktor påverkar främst klimatskärm (inkl. isolering)
-    if "Klimatskärm" in breakdown:
-        form_factor_scale = inp.form_factor / cfg.ref_form_factor
-
-        # Om byggnadshöjd finns: justera klimatskärmen svagt via "våningshöjdfaktor".
-        # (En grov proxy: högre våningshöjd -> mer fasadarea per BTA.)
-        if inp.building_height_m and inp.floors > 0:
-            ref_floor_height = 2.8  # m (heuristik)
-            floor_height = inp.building_height_m / float(inp.floors)
-            height_factor = max(0.8, min(1.3, floor_height / ref_floor_height))
-        else:
-            height_factor = 1.0
-
-        # Fönsterandel: antag att fönster är r gånger mer klimatintensivt per m² än vägg.
-        r = cfg.window_to_wall_intensity_ratio
-        w = inp.window_ratio
-        w0 = cfg.ref_window_ratio
+    form_factor_scale = form_factor * inv_ref_form_factor
+
+    # Om byggnadshöjd finns: justera klimatskärmen svagt via "våningshöjdfaktor".
+    # (En grov proxy: högre våningshöjd -> mer fasadarea per BTA.)
+    if has_height and floors > 0:
+        ref_floor_height = 2.8  # m (heuristik)
+        floor_height = building_height_m / float(floors)
+        height_factor = max(0.8, min(1.3, floor_height / ref_floor_height))
+    else:
+        height_factor = 1.0
+
+    # Fönsterandel: antag att fönster är r gånger mer klimatintensivt per m² än vägg.
+    # Nämnaren (mixen vid referensfönsterandel) är förberäknad som invers.
+    w = window_ratio
 
-        window_mix_factor = (w * r + (1 - w) * 1.0) / (w0 * r + (1 - w0) * 1.0)
+    window_mix_factor = (w * r + (1 - w) * 1.0) * inv_window_mix_denom
 
-        breakdown["Klimatskärm"] *= form_factor_scale * height_factor * window_mix_factor
+    f = form_factor_scale * height_factor * window_mix_factor
+    total += breakdown[IDX_KLIMATSKARM] * (f - 1.0)
+    breakdown[IDX_KLIMATSKARM] *= f
 
     # 3) Antal våningar: låg byggnad tenderar att ge högre klimatpåverkan per m² (grund+klimatskärm).
     # I denna screeningmodell lägger vi en mild korrigering för våningar < 4.
-    if inp.floors < 4:
-        lowrise_factor = 1.0 + 0.05 * (4 - inp.floors)
+    if floors < 4:
+        lowrise_factor = 1.0 + 0.05 * (4 - floors)
         # lägg på grund + klimatskärm (de är oftast mer area-beroende)
-        if "Grund" in breakdown:
-            breakdown["Grund"] *= lowrise_factor
-        if "Klimatskärm" in breakdown:
-            breakdown["Klimatskärm"] *= lowrise_factor
-
-    # 4) Stom- och metodval: påverkar "stomme+grund" dominerande.
-    method_mult = cfg.method_multiplier.get(inp.method, 1.0)
-
-    # Extra påslag för "tung betongdimensionering" (t.ex. massiva skalväggar)
-    heavy_mult = 1.10 if inp.heavy_concrete_design else 1.0
-
-    # Stomsystemfaktor: trä sänker ofta stomme/grund-relaterad klimatpåverkan.
-    # Här modelleras det som en reduktion på de stomrelaterade delarna, inte på allt.
-    if inp.structural_system == "Trä":
-        # Trästomme: i KTH:s referensvärdesstudie är träbyggnader (exkl. småhus) tydligt lägre än betong/stål.
-        # Vi applicerar därför en reduktion på de stomrelaterade byggdelarna. Storleken är kalibrerbar och
-        # sätts lite olika för 2022/2027-systemgräns.
-        system_struct_mult = 0.47 if boundary == "2022" else 0.51
-    elif inp.structural_system == "Stål":
-        system_struct_mult = 1.05
-    else:
-        system_struct_mult = 1.00
+        total += (breakdown[IDX_GRUND] + breakdown[IDX_KLIMATSKARM]) * (lowrise_factor - 1.0)
+        breakdown[IDX_GRUND] *= lowrise_factor
+        breakdown[IDX_KLIMATSKARM] *= lowrise_factor
 
-    # Applicera på relevanta byggdelar
-    for key in ("Stomme", "Grund", "Innerväggar"):
-        if key in breakdown:
-            breakdown[key] *= method_mult * heavy_mult * system_struct_mult
+    # 4) Stom- och metodval: applicera kombinerad multiplikator på relevanta byggdelar
+    for i in _STRUCT_IDX:
+        total += breakdown[i] * (struct_mult - 1.0)
+        breakdown[i] *= struct_mult
 
     # 5) Under mark: källare och garage
-    if inp.basement:
-        breakdown["Grund"] = breakdown.get("Grund", 0.0) + cfg.basement_add_kg_per_m2_bta
+    if basement:
+        breakdown[IDX_GRUND] += basement_add
+        total += basement_add
 
-    if inp.underground_garage:
+    if underground_garage:
         # Schablon från SBUF/IVL: +48 kg CO2e/m² Atemp vid parkeringstal ~0,5.
-        add_kg_bta = (
-            cfg.garage_add_kg_per_m2_atemp_parking05
-            * inp.atemp_to_bta
-            * (inp.parking_ratio / 0.5)
-        )
-        breakdown["Grund"] = breakdown.get("Grund", 0.0) + add_kg_bta
+        add_kg_bta = garage_add * atemp_to_bta * (parking_ratio / 0.5)
+        breakdown[IDX_GRUND] += add_kg_bta
+        total += add_kg_bta
 
     # 6) Klimatförbättrade material (betong/stål/aluminium)
-    if inp.climate_improved_materials:
-        baseline_improved = cfg.median_kg_per_m2_climate_improved[boundary]
-        baseline_generic = cfg.median_kg_per_m2[boundary]
-        diff = max(0.0, baseline_generic - baseline_improved)
+    if climate_improved:
+        diff = max(0.0, baseline - median_improved[boundary_idx])
 
         # Reducera främst stomme+grund+klimatskärm (där betong/metal oftast dominerar)
         # proportionalt mot totalen, men med "applicability" (träbyggnader får ofta mindre effekt).
-        affected_keys = ["Stomme", "Grund", "Klimatskärm"]
-        affected_sum = sum(breakdown.get(k, 0.0) for k in affected_keys)
-        total_pre = sum(breakdown.values())
+        affected = breakdown[_AFFECTED_MASK]
+        affected_sum = affected.sum()
+
+        if not (total > 0 and affected_sum > 0):
+            return breakdown, total, False
+
+        # Skala reduktionen med hur mycket totalen har ändrats från baseline
+        scale = total / baseline
+        target_reduction = diff * scale * applicability
+
+        # Fördela reduktionen proportionellt över påverkade byggdelar
+        reduced = np.maximum(0.0, affected - target_reduction * (affected / affected_sum))
+        breakdown[_AFFECTED_MASK] = reduced
+        total += reduced.sum() - affected_sum
+
+    return breakdown, total, True
+
 
-        if total_pre > 0 and affected_sum > 0:
-            # Skala reduktionen med hur mycket totalen har ändrats från baseline
-            scale = total_pre / baseline_generic
-            target_reduction = diff * scale * inp.climate_improved_applicability
+def estimate(inp: ModelInputs, cfg: Optional[ModelConfig] = None) -> ModelResult:
+    cfg = cfg or _shared_default_config()
+    notes = _validate_inputs(inp)  # memoiserad tuple, oftast samma tomma tuple
+
+    arrays = cfg.arrays
+    boundary_idx = _BOUNDARY_INDEX[inp.system_boundary]  # KeyError för okänd systemgräns
+
+    shares = (cfg.shares_2022, cfg.shares_2027)[boundary_idx]
+
+    system_idx = _SYSTEM_INDEX.get(inp.structural_system)
+    method_idx = arrays.method_index.get(inp.method)
+    if system_idx is None or method_idx is None:
+        # Okänd kombination (t.ex. metod utanför method_multiplier) – räkna direkt.
+        struct_mult = _struct_mult(
+            cfg.method_multiplier, inp.structural_system, inp.method, inp.heavy_concrete_design, boundary_idx
+        )
+    else:
+        heavy_idx = int(bool(inp.heavy_concrete_design))
+        struct_mult = arrays.struct_mult_table[system_idx, method_idx, heavy_idx, boundary_idx]
 
-            # Fördela reduktionen proportionellt över påverkade nycklar
-            for k in affected_keys:
-                if k in breakdown:
-                    breakdown[k] -= target_reduction * (breakdown[k] / affected_sum)
-                    breakdown[k] = max(0.0, breakdown[k])
-        else:
-            notes.append("Kunde inte applicera klimatförbättring (noll/negativt delbidrag).")
+    # Fönster/vägg-kvot: nämnaren i fönstermixen beror bara på cfg, utom när r överstyrs i indata.
+    r = inp.window_to_wall_intensity_ratio_override
+    if r is None:
+        r = cfg.window_to_wall_intensity_ratio
+        inv_window_mix_denom = cfg.inv_window_mix_denom
+    else:
+        inv_window_mix_denom = _inv_window_mix_denom(cfg.ref_window_ratio, r)
+
+    breakdown, total, climate_improved_ok = _estimate_core(
+        boundary_idx,
+        arrays.shares,
+        arrays.median,
+        arrays.median_improved,
+        float(inp.form_factor),
+        float(cfg.inv_ref_form_factor),
+        float(inp.window_ratio),
+        float(r),
+        float(inv_window_mix_denom),
+        int(inp.floors),
+        bool(inp.building_height_m),
+        float(inp.building_height_m or 0.0),
+        float(struct_mult),
+        bool(inp.basement),
+        float(cfg.basement_add_kg_per_m2_bta),
+        bool(inp.underground_garage),
+        float(cfg.garage_add_kg_per_m2_atemp_parking05),
+        float(inp.atemp_to_bta),
+        float(inp.parking_ratio),
+        bool(inp.climate_improved_materials),
+        float(inp.climate_improved_applicability),
+    )
+    if not climate_improved_ok:
+        notes = notes + ("Kunde inte applicera klimatförbättring (noll/negativt delbidrag).",)
 
-    total = sum(breakdown.values())
+    total = float(total)
+    values = breakdown.tolist()  # Python-floats; billigare än att indexera arrayen element för element
 
     # Virkeandel
     if inp.timber_t_per_m2_override is not None:
@@ -304,7 +534,7 @@ def estimate(inp: ModelInputs, cfg: Optional[ModelConfig] = None) -> ModelResult
     else:
         timber_t = cfg.timber_t_per_m2_default_by_system[inp.structural_system]
 
-    ref = 375.0  # Boverkets föreslagna (avrundade) median/gränsvärde för flerbostadshus (kg/m² BTA)
+    ref = REFERENCE_KG_PER_M2_BTA
     delta = total - ref
     delta_pct = (delta / ref) * 100.0
 
@@ -314,7 +544,114 @@ def estimate(inp: ModelInputs, cfg: Optional[ModelConfig] = None) -> ModelResult
         reference_kg_per_m2_bta=ref,
         delta_vs_reference_kg=delta,
         delta_vs_reference_percent=delta_pct,
-        breakdown_kg_per_m2_bta=breakdown,
+        breakdown_kg_per_m2_bta={k: values[_COMPONENT_INDEX[k]] for k in shares},
         timber_t_per_m2_bta=timber_t,
-        notes=tuple(notes),
+        notes=notes,
     )
+
+
+def estimate_batch(inputs: pd.DataFrame, cfg: Optional[ModelConfig] = None) -> pd.DataFrame:
+    """Vektoriserad estimate() för parametersvep/känslighetsanalys.
+
+    `inputs` har en rad per scenario och kolumner med samma namn som fälten i ModelInputs.
+    Kolumner som saknas får ModelInputs-defaultvärdet; `system_boundary`, `form_factor`,
+    `window_ratio` och `floors` är obligatoriska. Saknad byggnadshöjd/virkesoverride anges som NaN/None.
+
+    Returnerar en DataFrame (samma index som `inputs`) med totaler, avvikelse mot referens,
+    en kolumn per byggdel i COMPONENTS (0 för byggdelar utanför vald systemgräns) och virkesandel.
+    Valideringsnotiser tas inte med – använd estimate() för enskilda scenarier.
+    """
+    cfg = cfg or _shared_default_config()
+    n = len(inputs)
+    defaults = {f.name: f.default for f in fields(ModelInputs) if f.default is not MISSING}
+
+    def col(name: str, dtype=np.float64) -> np.ndarray:
+        if name not in inputs:
+            if name not in defaults:
+                raise KeyError(f"estimate_batch: kolumnen '{name}' saknas.")
+            return np.full(n, defaults[name], dtype=dtype)
+        if dtype is np.float64:
+            return inputs[name].to_numpy(dtype=dtype, na_value=np.nan)
+        return inputs[name].to_numpy(dtype=dtype)
+
+    boundary = col("system_boundary", object).astype(str).tolist()
+    boundary_idx = np.array([_BOUNDARY_INDEX[b] for b in boundary], dtype=np.intp)  # KeyError för okänd
+    structural_system = col("structural_system", object)
+    method = col("method", object)
+    heavy = col("heavy_concrete_design", bool)
+    floors = col("floors")
+    height = col("building_height_m")
+
+    # 1) Basbidrag per byggdel, (N, len(COMPONENTS))
+    arrays = cfg.arrays
+    baseline = arrays.median[boundary_idx]
+    breakdown = baseline[:, None] * arrays.shares[boundary_idx]
+
+    # 2) Geometri: formfaktor, våningshöjd och fönster/vägg-mix på klimatskärmen
+    form_factor_scale = col("form_factor") * cfg.inv_ref_form_factor
+    has_height = ~np.isnan(height) & (height != 0.0) & (floors > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        height_factor = np.where(has_height, np.clip(height / floors / 2.8, 0.8, 1.3), 1.0)
+    r_override = col("window_to_wall_intensity_ratio_override")
+    has_override = ~np.isnan(r_override)
+    r = np.where(has_override, r_override, cfg.window_to_wall_intensity_ratio)
+    w = col("window_ratio")
+    w0 = cfg.ref_window_ratio
+    inv_window_mix_denom = np.where(has_override, 1.0 / (w0 * r + (1 - w0) * 1.0), cfg.inv_window_mix_denom)
+    window_mix_factor = (w * r + (1 - w) * 1.0) * inv_window_mix_denom
+    breakdown[:, IDX_KLIMATSKARM] *= form_factor_scale * height_factor * window_mix_factor
+
+    # 3) Låga byggnader (< 4 våningar): mild korrigering på grund + klimatskärm
+    lowrise_factor = np.where(floors < 4, 1.0 + 0.05 * (4 - floors), 1.0)
+    breakdown[:, IDX_GRUND] *= lowrise_factor
+    breakdown[:, IDX_KLIMATSKARM] *= lowrise_factor
+
+    # 4) Stom- och metodval (kombinerad multiplikator per rad ur tabellen)
+    system_idx = np.array([_SYSTEM_INDEX.get(s, -1) for s in structural_system], dtype=np.intp)
+    method_idx = np.array([arrays.method_index.get(m, -1) for m in method], dtype=np.intp)
+    known = (system_idx >= 0) & (method_idx >= 0)
+    struct_mult = arrays.struct_mult_table[system_idx, method_idx, heavy.astype(np.intp), boundary_idx]
+    for i in np.flatnonzero(~known):
+        # Okänd kombination – räkna direkt (samma fallback som i estimate()).
+        struct_mult[i] = _struct_mult(
+            cfg.method_multiplier, structural_system[i], method[i], bool(heavy[i]), int(boundary_idx[i])
+        )
+    breakdown[:, _STRUCT_IDX] *= struct_mult[:, None]
+
+    # 5) Under mark: källare och garage
+    garage_add = cfg.garage_add_kg_per_m2_atemp_parking05 * col("atemp_to_bta") * (col("parking_ratio") / 0.5)
+    breakdown[:, IDX_GRUND] += np.where(col("basement", bool), cfg.basement_add_kg_per_m2_bta, 0.0)
+    breakdown[:, IDX_GRUND] += np.where(col("underground_garage", bool), garage_add, 0.0)
+
+    # 6) Klimatförbättrade material
+    diff = np.maximum(0.0, baseline - arrays.median_improved[boundary_idx])
+    affected = breakdown[:, _AFFECTED_MASK]
+    affected_sum = affected.sum(axis=1)
+    total_pre = breakdown.sum(axis=1)
+    apply = col("climate_improved_materials", bool) & (total_pre > 0) & (affected_sum > 0)
+    target_reduction = diff * (total_pre / baseline) * col("climate_improved_applicability")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reduced = np.maximum(0.0, affected - target_reduction[:, None] * (affected / affected_sum[:, None]))
+    breakdown[:, _AFFECTED_MASK] = np.where(apply[:, None], reduced, affected)
+
+    total = breakdown.sum(axis=1)
+
+    # Virkeandel
+    timber_override = col("timber_t_per_m2_override")
+    timber_t = np.maximum(0.0, timber_override)
+    # Defaultvärdet slås bara upp där override saknas (som i estimate()).
+    for i in np.flatnonzero(np.isnan(timber_override)):
+        timber_t[i] = cfg.timber_t_per_m2_default_by_system[structural_system[i]]
+
+    ref = REFERENCE_KG_PER_M2_BTA
+    delta = total - ref
+
+    out = {
+        "total_kg_per_m2_bta": total,
+        "total_t_per_m2_bta": total / 1000.0,
+        "delta_vs_reference_kg": delta,
+        "delta_vs_reference_percent": (delta / ref) * 100.0,
+    }
+    out.update({k: breakdown[:, i] for i, k in enumerate(COMPONENTS)})
+    out["timber_t_per_m2_bta"] = timber_t
+    return pd.DataFrame(out, index=inputs.index)
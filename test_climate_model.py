@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_model import COMPONENTS, ModelInputs, default_config, estimate, estimate_batch
+
+
+def _random_scenarios(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cfg = default_config()
+    methods = list(cfg.method_multiplier) + ["Okänd metod"]
+    return pd.DataFrame(
+        {
+            "system_boundary": rng.choice(["2022", "2027"], n),
+            "form_factor": rng.uniform(0.1, 1.6, n),
+            "window_ratio": rng.uniform(0.0, 0.9, n),
+            "floors": rng.integers(0, 17, n),
+            "building_height_m": rng.choice([None, -3.0, 0.0, 12.0, 30.0, 55.0], n),
+            "structural_system": rng.choice(["Betong", "Trä", "Stål"], n),
+            "method": rng.choice(methods, n),
+            "heavy_concrete_design": rng.random(n) < 0.5,
+            "climate_improved_materials": rng.random(n) < 0.5,
+            "climate_improved_applicability": rng.uniform(0.0, 1.0, n),
+            "basement": rng.random(n) < 0.5,
+            "underground_garage": rng.random(n) < 0.5,
+            "parking_ratio": rng.uniform(0.0, 1.5, n),
+            "atemp_to_bta": rng.uniform(0.75, 0.98, n),
+            "timber_t_per_m2_override": rng.choice([None, 0.0, 0.03, -0.01], n),
+            "window_to_wall_intensity_ratio_override": rng.choice([None, 1.5, 6.0], n),
+        }
+    )
+
+
+def _inputs_from_row(row: dict) -> ModelInputs:
+    row = {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in row.items()}
+    return ModelInputs(
+        system_boundary=row["system_boundary"],
+        form_factor=float(row["form_factor"]),
+        window_ratio=float(row["window_ratio"]),
+        floors=int(row["floors"]),
+        building_height_m=row["building_height_m"],
+        structural_system=row["structural_system"],
+        method=row["method"],
+        heavy_concrete_design=bool(row["heavy_concrete_design"]),
+        climate_improved_materials=bool(row["climate_improved_materials"]),
+        climate_improved_applicability=float(row["climate_improved_applicability"]),
+        basement=bool(row["basement"]),
+        underground_garage=bool(row["underground_garage"]),
+        parking_ratio=float(row["parking_ratio"]),
+        atemp_to_bta=float(row["atemp_to_bta"]),
+        timber_t_per_m2_override=row["timber_t_per_m2_override"],
+        window_to_wall_intensity_ratio_override=row["window_to_wall_intensity_ratio_override"],
+    )
+
+
+def test_estimate_batch_matches_estimate():
+    cfg = default_config()
+    scenarios = _random_scenarios(3000)
+    out = estimate_batch(scenarios, cfg)
+
+    for i, row in enumerate(scenarios.to_dict("records")):
+        res = estimate(_inputs_from_row(row), cfg)
+        batch = out.iloc[i]
+        assert batch["total_kg_per_m2_bta"] == pytest.approx(res.total_kg_per_m2_bta, rel=1e-9)
+        assert batch["delta_vs_reference_kg"] == pytest.approx(res.delta_vs_reference_kg, rel=1e-9, abs=1e-9)
+        assert batch["timber_t_per_m2_bta"] == pytest.approx(res.timber_t_per_m2_bta)
+        for k in COMPONENTS:
+            expected = res.breakdown_kg_per_m2_bta.get(k, 0.0)
+            assert batch[k] == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+def test_estimate_batch_timber_override_skips_system_lookup():
+    scenario = dict(
+        system_boundary="2022",
+        form_factor=0.45,
+        window_ratio=0.2,
+        floors=6,
+        structural_system="Okänt",
+        timber_t_per_m2_override=0.02,
+    )
+    out = estimate_batch(pd.DataFrame([scenario]))
+    res = estimate(ModelInputs(**scenario))
+
+    assert out["total_kg_per_m2_bta"].iloc[0] == pytest.approx(res.total_kg_per_m2_bta)
+    assert out["timber_t_per_m2_bta"].iloc[0] == pytest.approx(0.02)
+
+
+def test_estimate_batch_rejects_unknown_boundary():
+    scenario = dict(system_boundary="2030", form_factor=0.45, window_ratio=0.2, floors=6)
+    with pytest.raises(KeyError):
+        estimate_batch(pd.DataFrame([scenario]))